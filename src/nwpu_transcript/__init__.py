@@ -6,6 +6,8 @@ upload template.
 """
 
 __all__ = [
+    "TemplateState",
+    "load_template",
     "parse_chinese",
     "parse_english",
     "write_to_template",
@@ -14,5 +16,5 @@ __all__ = [
 __version__ = "0.1.0"
 
 from .parser import parse_chinese, parse_english  # noqa: E402
-from .excel import write_to_template  # noqa: E402
+from .excel import TemplateState, load_template, write_to_template  # noqa: E402
 
@@ -1,11 +1,12 @@
 from __future__ import annotations
 
 import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 from typing import Callable, Dict, List, Tuple
 
-from .excel import write_to_template
-from .parser import parse_chinese, parse_english
+from .excel import TemplateState, load_template, write_to_template
+from .parser import BACKENDS, parse_chinese, parse_english
 
 
 def build_arg_parser() -> argparse.ArgumentParser:
@@ -40,6 +41,12 @@ def build_arg_parser() -> argparse.ArgumentParser:
         default=Path("transcript_english.xlsx"),
         help="Output path for the English Excel file.",
     )
+    parser.add_argument(
+        "--backend",
+        choices=BACKENDS,
+        default="pdfplumber",
+        help="PDF library used to read the transcripts.",
+    )
     return parser
 
 
@@ -50,7 +57,7 @@ def main() -> None:
     if not template_path.exists():
         raise FileNotFoundError(f"Template not found: {template_path}")
 
-    tasks: List[Tuple[Callable[[Path], List[Dict[str, str]]], Path, Path]] = []
+    tasks: List[Tuple[Callable[[Path, str], List[Dict[str, str]]], Path, Path]] = []
 
     if args.chinese:
         tasks.append((parse_chinese, args.chinese.resolve(), args.output_chinese))
@@ -61,12 +68,46 @@ def main() -> None:
     if not tasks:
         raise SystemExit("No transcripts provided. Use --chinese and/or --english.")
 
-    for parser_func, pdf_path, output_path in tasks:
+    for _, pdf_path, _ in tasks:
         if not pdf_path.exists():
             raise FileNotFoundError(f"Transcript not found: {pdf_path}")
-        records = parser_func(pdf_path)
-        write_to_template(template_path, records, output_path)
-        print(f"Wrote {len(records)} rows to {output_path}")
+
+    template = load_template(template_path)
+    jobs = [
+        (parser_func, pdf_path, output_path, template, args.backend)
+        for parser_func, pdf_path, output_path in tasks
+    ]
+
+    if len(jobs) == 1:
+        output_path = jobs[0][2]
+        print(f"Wrote {_run_task(jobs[0])} rows to {output_path}")
+        return
+
+    error = None
+    # PDF parsing is pure-Python and GIL-bound, so use processes, not threads.
+    with ProcessPoolExecutor(max_workers=len(jobs)) as executor:
+        futures = {executor.submit(_run_task, job): job[2] for job in jobs}
+        # Report each output as it is written, so a failing job does not hide
+        # the file the other one produced; re-raise the failure afterwards.
+        for future in as_completed(futures):
+            try:
+                row_count = future.result()
+            except Exception as exc:
+                error = error or exc
+                continue
+            print(f"Wrote {row_count} rows to {futures[future]}")
+
+    if error is not None:
+        raise error
+
+
+def _run_task(
+    job: Tuple[Callable[[Path, str], List[Dict[str, str]]], Path, Path, TemplateState, str]
+) -> int:
+    parser_func, pdf_path, output_path, template, backend = job
+    records = parser_func(pdf_path, backend)
+    write_to_template(template, records, output_path)
+    return len(records)
 
 
 if __name__ == "__main__":  # pragma: no cover
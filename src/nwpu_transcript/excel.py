@@ -1,51 +1,112 @@
 from __future__ import annotations
 
+import errno
+import io
 import os
-import shutil
+import re
+import struct
 import tempfile
 from pathlib import Path
-from typing import Dict, Iterable, List, Tuple
+from typing import Dict, Iterable, List, NamedTuple, Tuple, Union
 from xml.etree import ElementTree as ET
-from zipfile import ZipFile, ZipInfo
+from xml.sax.saxutils import escape
+from zipfile import ZIP_DEFLATED, ZipFile, ZipInfo
 
 
-HEADER = ["课程名", "分数", "学分", "学时", "学时单位", "课程类别", "学期"]
-
 NS_MAIN = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
-NSMAP = {"main": NS_MAIN}
-
-# Ensure XML namespaces exist in output
-ET.register_namespace("", NS_MAIN)
-ET.register_namespace("r", "http://schemas.openxmlformats.org/officeDocument/2006/relationships")
-ET.register_namespace("xdr", "http://schemas.openxmlformats.org/drawingml/2006/spreadsheetDrawing")
-ET.register_namespace("x14", "http://schemas.microsoft.com/office/spreadsheetml/2009/9/main")
-ET.register_namespace("mc", "http://schemas.openxmlformats.org/markup-compatibility/2006")
-ET.register_namespace("etc", "http://www.wps.cn/officeDocument/2017/etCustomData")
-
-SHEET_NS_ATTRS = {
-    "xmlns:r": "http://schemas.openxmlformats.org/officeDocument/2006/relationships",
-    "xmlns:xdr": "http://schemas.openxmlformats.org/drawingml/2006/spreadsheetDrawing",
-    "xmlns:x14": "http://schemas.microsoft.com/office/spreadsheetml/2009/9/main",
-    "xmlns:mc": "http://schemas.openxmlformats.org/markup-compatibility/2006",
-    "xmlns:etc": "http://www.wps.cn/officeDocument/2017/etCustomData",
-}
+_SI_TAG = f"{{{NS_MAIN}}}si"
+_T_TAG = f"{{{NS_MAIN}}}t"
+
+# (column letter, record key, cell style id) for each data column
+_COLUMNS = (
+    ("A", "课程名", "5"),
+    ("B", "分数", "5"),
+    ("C", "学分", "5"),
+    ("D", "学时", "5"),
+    ("E", "学时单位", "6"),
+    ("F", "课程类别", "5"),
+    ("G", "学期", "7"),
+)
+
+_LOCAL_HEADER_MAGIC = b"PK\x03\x04"
+_LOCAL_HEADER_SIZE = 30
+_FLAG_DATA_DESCRIPTOR = 0x08
+_COPY_CHUNK_SIZE = 64 * 1024
+_GENERATED_COMPRESSLEVEL = 1
+
+_SHEET_DATA_OPEN_RE = re.compile(rb"<sheetData\b[^>]*?(/?)>")
+_HEADER_ROW_RE = re.compile(rb"\s*<row\b[^>]*?(?:/>|>.*?</row>)", re.S)
+_DIMENSION_REF_RE = re.compile(rb'(<dimension\b[^>]*?\bref=")[^"]*(")')
+_SST_OPEN_RE = re.compile(rb"<sst\b[^>]*?(/?)>")
+_XML_COUNT_RE = re.compile(rb"""\scount\s*=\s*(["'])(\d+)\1""")
+
+
+class TemplateState(NamedTuple):
+    """Template pieces parsed once by :func:`load_template` and reused per output."""
+
+    path: Path
+    sheet_prefix: bytes
+    header_row: bytes
+    sheet_suffix: bytes
+    shared_prefix: bytes
+    shared_open_tag: bytes
+    shared_body: bytes
+    shared_suffix: bytes
+    shared_index: Dict[str, str]
+    shared_unique: int
+    shared_count: int
+
+
+def load_template(template_path: Path) -> TemplateState:
+    """Read and split the template's sheet and shared strings.
+
+    Pass the result to :func:`write_to_template` to render several outputs
+    from the same template without parsing it again.
+    """
+    with ZipFile(template_path) as z:
+        sheet_xml = z.read("xl/worksheets/sheet1.xml")
+        shared_xml = z.read("xl/sharedStrings.xml")
+
+    prefix, header_row, suffix = _split_sheet(sheet_xml)
+    shared_prefix, open_tag, body, shared_suffix = _split_shared_strings(shared_xml)
+
+    shared_index, shared_unique = _index_shared_strings(shared_xml)
+    count = _XML_COUNT_RE.search(open_tag)
+    return TemplateState(
+        path=Path(template_path),
+        sheet_prefix=prefix,
+        header_row=header_row,
+        sheet_suffix=suffix,
+        shared_prefix=shared_prefix,
+        shared_open_tag=open_tag,
+        shared_body=body,
+        shared_suffix=shared_suffix,
+        shared_index=shared_index,
+        shared_unique=shared_unique,
+        shared_count=int(count.group(2)) if count else shared_unique,
+    )
 
 
 def write_to_template(
-    template_path: Path, records: Iterable[Dict[str, str]], output_path: Path
+    template: Union[Path, TemplateState],
+    records: Iterable[Dict[str, str]],
+    output_path: Path,
 ) -> None:
     """Render rows into the Excel template and write to ``output_path``.
 
-    The template is copied byte-for-byte, and only the ``sharedStrings.xml``
-    and ``xl/worksheets/sheet1.xml`` payloads are regenerated to include the
-    provided rows while preserving styles and metadata.
+    ``template`` is either the template path or a :class:`TemplateState`
+    from :func:`load_template`. Template members are copied byte-for-byte,
+    and only the ``sharedStrings.xml`` and ``xl/worksheets/sheet1.xml``
+    payloads are regenerated to include the provided rows while preserving
+    styles and metadata.
     """
-    rows = list(records)
-    shutil.copyfile(template_path, output_path)
+    if not isinstance(template, TemplateState):
+        template = load_template(template)
 
-    sheet_xml, shared_strings_xml = _render_sheet(template_path, rows)
-    _replace_zip_entries(
-        output_path,
+    sheet_xml, shared_strings_xml = _render_sheet(template, records)
+    _write_with_replacements(
+        template.path,
+        Path(output_path),
         {
             "xl/worksheets/sheet1.xml": sheet_xml,
             "xl/sharedStrings.xml": shared_strings_xml,
@@ -70,112 +131,269 @@ def _clone_zipinfo(info: ZipInfo, filename: str | None = None) -> ZipInfo:
 
 
 def _render_sheet(
-    template_path: Path, records: List[Dict[str, str]]
+    template: TemplateState, records: Iterable[Dict[str, str]]
 ) -> Tuple[bytes, bytes]:
-    with ZipFile(template_path) as z:
-        sheet_root = ET.fromstring(z.read("xl/worksheets/sheet1.xml"))
-        shared_root = ET.fromstring(z.read("xl/sharedStrings.xml"))
+    # Copy the cached index so outputs rendered from one state stay independent.
+    shared_strings = _SharedStrings(
+        dict(template.shared_index), template.shared_unique, template.shared_count
+    )
+
+    rows_xml, row_count = _render_rows(records, shared_strings)
+    last_row = row_count + 1
+    prefix = _DIMENSION_REF_RE.sub(
+        rb"\g<1>A1:G%d\g<2>" % last_row, template.sheet_prefix, count=1
+    )
+    sheet_bytes = b"".join(
+        (prefix, template.header_row, rows_xml.encode("utf-8"), template.sheet_suffix)
+    )
 
-    # Ensure namespaces are present
-    for attr, value in SHEET_NS_ATTRS.items():
-        if attr not in sheet_root.attrib:
-            sheet_root.set(attr, value)
+    open_tag = _set_xml_attributes(
+        template.shared_open_tag,
+        {b"count": shared_strings.count, b"uniqueCount": shared_strings.unique},
+    )
+    new_items = "".join(f"<si><t>{escape(text)}</t></si>" for text in shared_strings.added)
+    shared_bytes = b"".join(
+        (
+            template.shared_prefix,
+            open_tag,
+            template.shared_body,
+            new_items.encode("utf-8"),
+            template.shared_suffix,
+        )
+    )
 
-    sheet_data = sheet_root.find("main:sheetData", NSMAP)
-    if sheet_data is None:
-        raise ValueError("Template sheet missing sheetData node")
+    return sheet_bytes, shared_bytes
 
-    rows = sheet_data.findall("main:row", NSMAP)
-    if not rows:
+
+class _SharedStrings:
+    """Shared string table that deduplicates values appended by new cells.
+
+    Entries already in the template are only known through ``index``; values
+    not found there are collected in ``added`` and appended after them.
+    Indices are stored as the text written into ``<v>``, so a repeated value
+    costs one dict hit and no ``str(int)`` conversion.
+    """
+
+    def __init__(self, index: Dict[str, str], unique: int, count: int) -> None:
+        self.index = index
+        self.unique = unique
+        self.count = count
+        self.added: List[str] = []
+
+    def add(self, value: str) -> str:
+        index = self.index.get(value)
+        if index is None:
+            index = str(self.unique)
+            self.unique += 1
+            self.index[value] = index
+            self.added.append(value)
+        self.count += 1
+        return index
+
+
+def _split_sheet(sheet_xml: bytes) -> Tuple[bytes, bytes, bytes]:
+    """Split ``sheet1.xml`` into the bytes up to ``<sheetData>``, the header row,
+    and everything from ``</sheetData>`` on, so new rows can be spliced in."""
+    opening = _SHEET_DATA_OPEN_RE.search(sheet_xml)
+    if opening is None:
+        raise ValueError("Template sheet missing sheetData node")
+    if opening.group(1):
         raise ValueError("Template sheet missing header row")
 
-    header_row = rows[0]
+    body_start = opening.end()
+    body_end = sheet_xml.find(b"</sheetData>", body_start)
+    if body_end == -1:
+        raise ValueError("Template sheet missing sheetData node")
 
-    # Reset sheetData to preserve the header only
-    sheet_data.clear()
-    sheet_data.append(header_row)
+    header = _HEADER_ROW_RE.match(sheet_xml, body_start, body_end)
+    if header is None:
+        raise ValueError("Template sheet missing header row")
 
-    column_order = ["课程名", "分数", "学分", "学时", "学时单位", "课程类别", "学期"]
-    col_letters = ["A", "B", "C", "D", "E", "F", "G"]
-    column_styles = {"A": "5", "B": "5", "C": "5", "D": "5", "E": "6", "F": "5", "G": "7"}
+    return sheet_xml[:body_start], header.group(0).lstrip(), sheet_xml[body_end:]
+
+
+def _split_shared_strings(shared_xml: bytes) -> Tuple[bytes, bytes, bytes, bytes]:
+    """Split ``sharedStrings.xml`` into the bytes before ``<sst>``, the ``<sst>``
+    start tag, the existing entries, and everything from ``</sst>`` on."""
+    opening = _SST_OPEN_RE.search(shared_xml)
+    if opening is None:
+        raise ValueError("Template shared strings missing sst node")
+    if opening.group(1):
+        # Expand <sst .../> so new entries have somewhere to go.
+        open_tag = opening.group(0)[:-2].rstrip() + b">"
+        return shared_xml[: opening.start()], open_tag, b"", b"</sst>" + shared_xml[opening.end() :]
+
+    body_end = shared_xml.rfind(b"</sst>")
+    if body_end < opening.end():
+        raise ValueError("Template shared strings missing sst node")
+    return (
+        shared_xml[: opening.start()],
+        opening.group(0),
+        shared_xml[opening.end() : body_end],
+        shared_xml[body_end:],
+    )
 
-    shared_strings = [
-        (si.find("main:t", NSMAP).text or "") for si in shared_root.findall("main:si", NSMAP)
-    ]
-    string_to_index = {text: idx for idx, text in enumerate(shared_strings)}
-    total_count = int(shared_root.attrib.get("count", len(shared_strings)))
 
+def _index_shared_strings(shared_xml: bytes) -> Tuple[Dict[str, str], int]:
+    """Map plain-text ``<si>`` entries to their index and count all entries.
+
+    Only the index is needed to reuse existing entries, since the original
+    ``<si>`` markup is carried over verbatim, so entries are streamed and
+    cleared instead of keeping the whole tree. Rich-text entries take up an
+    index but are never reused for plain values.
+    """
+    index: Dict[str, str] = {}
+    position = 0
+    for _, elem in ET.iterparse(io.BytesIO(shared_xml), events=("end",)):
+        if elem.tag != _SI_TAG:
+            continue
+        t_el = elem.find(_T_TAG)
+        if t_el is not None:
+            index.setdefault(t_el.text or "", str(position))
+        position += 1
+        elem.clear()
+    return index, position
+
+
+def _set_xml_attributes(tag: bytes, values: Dict[bytes, int]) -> bytes:
+    for name, value in values.items():
+        attribute = b' %s="%d"' % (name, value)
+        # Attribute values may be quoted either way, with spaces around "=".
+        pattern = rb"""\s%s\s*=\s*(?:"[^"]*"|'[^']*')""" % name
+        tag, found = re.subn(pattern, attribute, tag, count=1)
+        if not found:
+            tag = tag[:-1] + attribute + b">"
+    return tag
+
+
+def _render_rows(
+    records: Iterable[Dict[str, str]], shared_strings: _SharedStrings
+) -> Tuple[str, int]:
+    """Render the data rows as ``<row>`` markup, registering shared strings.
+
+    Every cell value goes through the shared string table, so the emitted
+    markup only ever contains row numbers, style ids and integer indices and
+    needs no escaping.
+    """
+    add = shared_strings.add
+    parts: List[str] = []
+    row_count = 0
     for idx, record in enumerate(records, start=2):
-        row_el = ET.Element(f"{{{NS_MAIN}}}row", {"r": str(idx), "spans": "1:7"})
-        for letter, key in zip(col_letters, column_order):
-            value = record.get(key, "")
-            if value is None:
-                value = ""
-            cell_attrs = {"r": f"{letter}{idx}", "s": column_styles.get(letter, "5")}
-            if value == "":
-                ET.SubElement(row_el, f"{{{NS_MAIN}}}c", cell_attrs)
-                continue
-
-            value_str = str(value)
-            if value_str not in string_to_index:
-                string_to_index[value_str] = len(shared_strings)
-                shared_strings.append(value_str)
-            index = string_to_index[value_str]
-            total_count += 1
-
-            cell_attrs["t"] = "s"
-            cell_el = ET.SubElement(row_el, f"{{{NS_MAIN}}}c", cell_attrs)
-            v_el = ET.SubElement(cell_el, f"{{{NS_MAIN}}}v")
-            v_el.text = str(index)
-        sheet_data.append(row_el)
-
-    dimension = sheet_root.find("main:dimension", NSMAP)
-    last_row = len(records) + 1 if records else 1
-    if dimension is not None:
-        dimension.set("ref", f"A1:G{last_row}")
-
-    new_shared_root = ET.Element(
-        f"{{{NS_MAIN}}}sst",
-        {
-            "count": str(total_count),
-            "uniqueCount": str(len(shared_strings)),
-        },
+        parts.append(_emit_row(idx, record, add))
+        row_count += 1
+    return "".join(parts), row_count
+
+
+def _build_row_emitter(columns: Tuple[Tuple[str, str, str], ...]):
+    """Compile ``_emit_row(row, record, add)`` specialized for ``columns``.
+
+    The column letters, record keys and styles are baked into the generated
+    source as literals, so rendering a row needs no per-column loop or style
+    lookup. ``add`` registers a shared string and returns its index as text.
+    """
+    lines = ["def _emit_row(row, record, add):"]
+    cells = []
+    for position, (letter, key, style) in enumerate(columns):
+        value = f"v{position}"
+        cell = f"c{position}"
+        lines += [
+            f"    {value} = record.get({key!r})",
+            f"    if {value} is None or {value} == '':",
+            f"        {cell} = f'<c r=\"{letter}{{row}}\" s=\"{style}\"/>'",
+            "    else:",
+            f"        {cell} = f'<c r=\"{letter}{{row}}\" s=\"{style}\" t=\"s\">"
+            f"<v>{{add({value} if type({value}) is str else str({value}))}}</v></c>'",
+        ]
+        cells.append(cell)
+    spans = f"1:{len(columns)}"
+    lines.append(
+        f"    return ''.join((f'<row r=\"{{row}}\" spans=\"{spans}\">', "
+        + ", ".join(cells)
+        + ", '</row>'))"
     )
-    for text in shared_strings:
-        si_el = ET.SubElement(new_shared_root, f"{{{NS_MAIN}}}si")
-        t_el = ET.SubElement(si_el, f"{{{NS_MAIN}}}t")
-        t_el.text = text
 
-    sheet_fragment = ET.tostring(sheet_root, encoding="unicode", xml_declaration=False)
-    shared_fragment = ET.tostring(new_shared_root, encoding="unicode", xml_declaration=False)
+    namespace: Dict[str, object] = {}
+    exec(compile("\n".join(lines), "<nwpu_transcript row emitter>", "exec"), namespace)
+    return namespace["_emit_row"]
 
-    prefix = "<?xml version=\"1.0\" encoding=\"UTF-8\" standalone=\"yes\"?>\r\n"
-    sheet_bytes = (prefix + sheet_fragment).encode("utf-8")
-    shared_bytes = (prefix + shared_fragment).encode("utf-8")
 
-    return sheet_bytes, shared_bytes
+_emit_row = _build_row_emitter(_COLUMNS)
 
 
-def _replace_zip_entries(zip_path: Path, replacements: Dict[str, bytes]) -> None:
-    with ZipFile(zip_path) as existing_zip:
-        infos = existing_zip.infolist()
-        data = {info.filename: existing_zip.read(info.filename) for info in infos}
+def _write_with_replacements(
+    source_path: Path, output_path: Path, replacements: Dict[str, bytes]
+) -> None:
+    pending = dict(replacements)
 
-    data.update(replacements)
+    # The temp file lives next to the output; report the requested path, not
+    # the temp name, when its directory is missing.
+    if not output_path.parent.is_dir():
+        raise FileNotFoundError(
+            errno.ENOENT, "Output directory does not exist", str(output_path)
+        )
 
-    with tempfile.NamedTemporaryFile(delete=False) as tmp_file:
+    with tempfile.NamedTemporaryFile(dir=output_path.parent, delete=False) as tmp_file:
         tmp_path = Path(tmp_file.name)
 
-    with ZipFile(tmp_path, "w") as rewritten_zip:
-        for info in infos:
-            name = info.filename
-            if name not in data:
-                continue
-            rewritten_zip.writestr(_clone_zipinfo(info), data.pop(name))
+    try:
+        with ZipFile(source_path) as source_zip, ZipFile(tmp_path, "w") as output_zip:
+            for info in source_zip.infolist():
+                payload = pending.pop(info.filename, None)
+                if payload is None:
+                    _copy_raw_member(source_zip, output_zip, info)
+                else:
+                    _write_generated_member(output_zip, _clone_zipinfo(info), payload)
+
+            for name, payload in pending.items():
+                _write_generated_member(output_zip, ZipInfo(name), payload)
+    except BaseException:
+        tmp_path.unlink()
+        raise
 
-        for name, payload in data.items():
-            info = ZipInfo(name)
-            rewritten_zip.writestr(info, payload)
+    os.replace(tmp_path, output_path)
 
-    os.replace(tmp_path, zip_path)
 
+def _write_generated_member(output_zip: ZipFile, info: ZipInfo, payload: bytes) -> None:
+    # Level 1 deflate is several times faster than the default level on
+    # repetitive XML for a small size cost.
+    info.compress_type = ZIP_DEFLATED
+    output_zip.writestr(info, payload, compresslevel=_GENERATED_COMPRESSLEVEL)
+
+
+def _copy_raw_member(source_zip: ZipFile, output_zip: ZipFile, info: ZipInfo) -> None:
+    """Copy a member's compressed bytes verbatim, skipping inflate/deflate.
+
+    ``zipfile`` has no public raw-copy API, so this writes the local header and
+    data itself and registers the entry the same way ``ZipFile.writestr``
+    does, leaving the central directory to ``ZipFile.close``.
+    """
+    source_fp = source_zip.fp
+    source_fp.seek(info.header_offset)
+    local_header = source_fp.read(_LOCAL_HEADER_SIZE)
+    if len(local_header) != _LOCAL_HEADER_SIZE or local_header[:4] != _LOCAL_HEADER_MAGIC:
+        raise ValueError(f"Bad local file header for {info.filename!r} in template")
+    name_length, extra_length = struct.unpack("<HH", local_header[26:30])
+    source_fp.seek(info.header_offset + _LOCAL_HEADER_SIZE + name_length + extra_length)
+
+    clone = _clone_zipinfo(info)
+    clone.CRC = info.CRC
+    clone.compress_size = info.compress_size
+    clone.file_size = info.file_size
+    # Sizes and CRC are known up front, so no trailing data descriptor.
+    clone.flag_bits &= ~_FLAG_DATA_DESCRIPTOR
+
+    output_fp = output_zip.fp
+    clone.header_offset = output_fp.tell()
+    output_fp.write(clone.FileHeader())
+
+    remaining = info.compress_size
+    while remaining:
+        chunk = source_fp.read(min(_COPY_CHUNK_SIZE, remaining))
+        if not chunk:
+            raise ValueError(f"Truncated data for {info.filename!r} in template")
+        output_fp.write(chunk)
+        remaining -= len(chunk)
+
+    output_zip.start_dir = output_fp.tell()
+    output_zip.filelist.append(clone)
+    output_zip.NameToInfo[clone.filename] = clone
@@ -1,10 +1,60 @@
 from __future__ import annotations
 
+import inspect
 import re
+from bisect import bisect_right
+from contextlib import closing
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 
 import pdfplumber
+from pdfplumber.table import TableSettings
+from pdfplumber.utils import extract_text
+
+try:
+    import pymupdf
+except ImportError:  # pragma: no cover - exercised only without PyMuPDF >= 1.24
+    try:
+        # PyMuPDF releases before 1.24 only ship the legacy ``fitz`` name.
+        import fitz as pymupdf
+    except ImportError:
+        pymupdf = None
+
+BACKENDS = ("pdfplumber", "pymupdf")
+
+_TABLE_SETTINGS = {
+    "vertical_strategy": "lines",
+    "horizontal_strategy": "lines",
+    "intersection_tolerance": 5,
+    "snap_tolerance": 6,
+}
+
+
+def _mupdf_table_settings() -> Dict[str, object]:
+    """``_TABLE_SETTINGS`` as keyword arguments for PyMuPDF's ``find_tables``.
+
+    Newer PyMuPDF releases gate line-based tables through ``page.get_layout()``
+    by default, so detection would change once ``pymupdf_layout`` is installed.
+    Turn it off where supported so tables are found from ruling lines alone,
+    as pdfplumber does.
+    """
+    settings: Dict[str, object] = dict(_TABLE_SETTINGS)
+    finder = getattr(getattr(pymupdf, "table", None), "find_tables", None)
+    if finder is not None and "use_layout" in inspect.signature(finder).parameters:
+        settings["use_layout"] = False
+    return settings
+
+
+_MUPDF_TABLE_SETTINGS = _mupdf_table_settings()
+
+# Text settings ``extract_table`` passes to ``Table.extract`` for these settings
+_TEXT_SETTINGS = TableSettings.resolve(_TABLE_SETTINGS).text_settings or {}
+
+_CN_TERM_RE = re.compile(r"^(\d{4})-(\d{4})([春夏秋冬])$")
+_EN_TERM_RE = re.compile(r"^(\d)(?:st|nd|rd|th)?\s*(\d{4}-\d{4})$")
+_CN_SEASON_NUMBERS = {"秋": "1", "春": "2", "冬": "3", "夏": "3"}
+_CN_NON_TERMS = frozenset({"学期", "总学分绩点"})
+_CN_SKIP_PREFIXES = ("姓名", "民族", "班级", "课程名称", "毕业设计", "应修总学分", "国家英语")
 
 
 def _clean_text(value) -> str:
@@ -13,18 +63,137 @@ def _clean_text(value) -> str:
     return str(value).strip()
 
 
+Grid = List[List[Optional[str]]]
+
+
+def _iter_page_grids(
+    pdf_path: Path, backend: str, max_pages: Optional[int] = None, largest_only: bool = False
+) -> Iterator[List[Grid]]:
+    """Yield the ruled tables of each page as rows of cell text.
+
+    With ``largest_only`` only the table ``extract_table`` would pick is kept.
+    The grid comes from the backend's line-based table finder, and each
+    character is binned into the cell containing its midpoint, as
+    ``Table.extract`` does, but by bisecting row tops instead of re-filtering
+    every character against every row and cell. Column indices and cell text
+    match ``extract_table`` output.
+    """
+    if backend == "pdfplumber":
+        # pdfplumber's ``pages`` filter is 1-indexed and skips the rest entirely.
+        pages = list(range(1, max_pages + 1)) if max_pages is not None else None
+        with pdfplumber.open(pdf_path, pages=pages) as pdf:
+            for page in pdf.pages:
+                tables = page.find_tables(table_settings=_TABLE_SETTINGS)
+                yield _bin_tables(tables, page.chars if tables else [], largest_only)
+    elif backend == "pymupdf":
+        if pymupdf is None:
+            raise ImportError("The pymupdf backend requires PyMuPDF: pip install pymupdf")
+        if hasattr(pymupdf, "no_recommend_layout"):
+            # find_tables prints a pymupdf_layout install hint to stdout, which
+            # does not apply with layout gating turned off.
+            pymupdf.no_recommend_layout()
+        with pymupdf.open(pdf_path) as doc:
+            for page in doc.pages(0, max_pages):
+                tables = page.find_tables(**_MUPDF_TABLE_SETTINGS).tables
+                yield _bin_tables(tables, _mupdf_chars(page) if tables else [], largest_only)
+    else:
+        raise ValueError(f"Unknown PDF backend: {backend!r} (expected one of {BACKENDS})")
+
+
+def _mupdf_chars(page) -> List[dict]:
+    """Return the page's characters in the dict shape pdfplumber uses."""
+    # PyMuPDF otherwise inserts synthetic spaces between glyph runs; pdfminer
+    # reports only the characters actually drawn.
+    flags = pymupdf.TEXTFLAGS_RAWDICT | pymupdf.TEXT_INHIBIT_SPACES
+    # Glyph boxes default to the font's full ascender/descender height; the
+    # small heights match pdfminer's and put each midpoint in the same row.
+    small_glyph_heights = pymupdf.TOOLS.set_small_glyph_heights()
+    pymupdf.TOOLS.set_small_glyph_heights(True)
+    try:
+        blocks = page.get_text("rawdict", flags=flags)["blocks"]
+    finally:
+        pymupdf.TOOLS.set_small_glyph_heights(small_glyph_heights)
+
+    chars: List[dict] = []
+    for block in blocks:
+        for line in block.get("lines", ()):
+            upright = line["dir"] == (1.0, 0.0)
+            for span in line["spans"]:
+                for char in span["chars"]:
+                    x0, top, x1, bottom = char["bbox"]
+                    chars.append(
+                        {
+                            "text": char["c"],
+                            "x0": x0,
+                            "x1": x1,
+                            "top": top,
+                            "bottom": bottom,
+                            "doctop": top,
+                            "upright": upright,
+                        }
+                    )
+    return chars
+
+
+def _bin_tables(tables, chars: List[dict], largest_only: bool) -> List[Grid]:
+    if largest_only and tables:
+        tables = [min(tables, key=lambda t: (-len(t.cells), t.bbox[1], t.bbox[0]))]
+    return [_bin_chars(table, chars) for table in tables]
+
+
+def _bin_chars(table, chars: List[dict]) -> Grid:
+    rows = table.rows
+    row_tops = [row.bbox[1] for row in rows]
+    left, top, right, bottom = table.bbox
+    cell_chars: Dict[Tuple[int, int], List[dict]] = {}
+
+    for char in chars:
+        x = (char["x0"] + char["x1"]) / 2
+        y = (char["top"] + char["bottom"]) / 2
+        if not (left <= x < right and top <= y < bottom):
+            continue
+        # Cells spanning several rows belong to the row they start in, so walk
+        # upwards from the row whose top is nearest above the character.
+        for row_idx in range(bisect_right(row_tops, y) - 1, -1, -1):
+            col_idx = _find_cell(rows[row_idx].cells, x, y)
+            if col_idx is not None:
+                cell_chars.setdefault((row_idx, col_idx), []).append(char)
+                break
+
+    grid: Grid = []
+    for row_idx, row in enumerate(rows):
+        cells: List[Optional[str]] = []
+        for col_idx, cell in enumerate(row.cells):
+            if cell is None:
+                cells.append(None)
+                continue
+            binned = cell_chars.get((row_idx, col_idx))
+            cells.append(extract_text(binned, **_TEXT_SETTINGS) if binned else "")
+        grid.append(cells)
+    return grid
+
+
+def _find_cell(cells, x: float, y: float) -> Optional[int]:
+    for col_idx, cell in enumerate(cells):
+        if cell is None:
+            continue
+        x0, top, x1, bottom = cell
+        if x0 <= x < x1 and top <= y < bottom:
+            return col_idx
+    return None
+
+
 def _convert_chinese_semester(term: str) -> str | None:
     if not term:
         return None
     term = term.strip()
-    if term in {"学期", "总学分绩点"}:
+    if term in _CN_NON_TERMS:
         return None
-    match = re.match(r"^(\d{4})-(\d{4})([春夏秋冬])$", term)
+    match = _CN_TERM_RE.match(term)
     if not match:
         return None
     start, end, season = match.groups()
-    mapping = {"秋": "1", "春": "2", "冬": "3", "夏": "3"}
-    number = mapping.get(season)
+    number = _CN_SEASON_NUMBERS.get(season)
     if not number:
         return None
     return f"{start}-{end}-{number}"
@@ -34,37 +203,33 @@ def _convert_english_semester(term: str) -> str | None:
     if not term:
         return None
     cleaned = term.replace("\n", " ").replace("\r", " ").strip()
-    match = re.match(r"^(\d)(?:st|nd|rd|th)?\s*(\d{4}-\d{4})$", cleaned)
+    match = _EN_TERM_RE.match(cleaned)
     if not match:
         return None
     order, years = match.groups()
     return f"{years}-{order}"
 
 
-def parse_chinese(pdf_path: Path) -> List[Dict[str, str]]:
-    """Parse the Chinese transcript PDF into records compatible with the template."""
+def parse_chinese(pdf_path: Path, backend: str = "pdfplumber") -> List[Dict[str, str]]:
+    """Parse the Chinese transcript PDF into records compatible with the template.
+
+    ``backend`` selects the PDF library: ``"pdfplumber"`` or ``"pymupdf"``.
+    """
     left_records: List[Dict[str, str]] = []
     right_records: List[Dict[str, str]] = []
-    with pdfplumber.open(pdf_path) as pdf:
-        table = pdf.pages[0].extract_table(
-            table_settings={
-                "vertical_strategy": "lines",
-                "horizontal_strategy": "lines",
-                "intersection_tolerance": 5,
-                "snap_tolerance": 6,
-            }
-        )
+    # Close the generator so the PDF is released before the rows are parsed.
+    with closing(_iter_page_grids(pdf_path, backend, max_pages=1, largest_only=True)) as pages:
+        tables = next(pages, [])
 
-    if not table:
+    if not tables:
         return []
+    table = tables[0]
 
     segments = (
         {"name": 0, "credit": 3, "score": 4, "category": 5, "semester": 8},
         {"name": 10, "credit": 15, "score": 16, "category": 17, "semester": 20},
     )
 
-    skip_prefixes = ("姓名", "民族", "班级", "课程名称", "毕业设计", "应修总学分", "国家英语")
-
     for row in table:
         if not row:
             continue
@@ -76,7 +241,7 @@ def parse_chinese(pdf_path: Path) -> List[Dict[str, str]]:
             name = _clean_text(name_raw)
             if not name:
                 continue
-            if any(name.startswith(prefix) for prefix in skip_prefixes):
+            if name.startswith(_CN_SKIP_PREFIXES):
                 continue
 
             semester_idx = indices["semester"]
@@ -129,24 +294,32 @@ def _parse_header_positions(header: List[str]) -> Tuple[Dict[str, int], Dict[str
     return left_positions, right_positions
 
 
-def _extract_english_record(row: List[str], positions: Dict[str, int]) -> Dict[str, str] | None:
-    name_idx = positions["course"]
+def _record_columns(positions: Dict[str, int]) -> Tuple[int, int, int, int, int]:
+    """Order header positions as ``_extract_english_record`` expects them."""
+    return (
+        positions["course"],
+        positions["semester"],
+        positions["credit"],
+        positions["score"],
+        positions["type"],
+    )
+
+
+def _extract_english_record(
+    row: List[str], columns: Tuple[int, int, int, int, int]
+) -> Dict[str, str] | None:
+    name_idx, semester_idx, credit_idx, score_idx, type_idx = columns
     if name_idx >= len(row):
         return None
     name = _clean_text(row[name_idx])
     if not name or name == "Course":
         return None
 
-    semester_idx = positions["semester"]
     semester_raw = row[semester_idx] if semester_idx < len(row) else None
     semester = _convert_english_semester(_clean_text(semester_raw))
     if not semester:
         return None
 
-    credit_idx = positions["credit"]
-    score_idx = positions["score"]
-    type_idx = positions["type"]
-
     credit = _clean_text(row[credit_idx]) if credit_idx < len(row) else ""
     score = _clean_text(row[score_idx]) if score_idx < len(row) else ""
     course_type = _clean_text(row[type_idx]) if type_idx < len(row) else ""
@@ -162,49 +335,46 @@ def _extract_english_record(row: List[str], positions: Dict[str, int]) -> Dict[s
     }
 
 
-def parse_english(pdf_path: Path) -> List[Dict[str, str]]:
-    """Parse the English transcript PDF into records compatible with the template."""
+def parse_english(pdf_path: Path, backend: str = "pdfplumber") -> List[Dict[str, str]]:
+    """Parse the English transcript PDF into records compatible with the template.
+
+    ``backend`` selects the PDF library: ``"pdfplumber"`` or ``"pymupdf"``.
+    """
     records: List[Dict[str, str]] = []
-    with pdfplumber.open(pdf_path) as pdf:
-        for page in pdf.pages:
-            tables = page.extract_tables(
-                table_settings={
-                    "vertical_strategy": "lines",
-                    "horizontal_strategy": "lines",
-                    "intersection_tolerance": 5,
-                    "snap_tolerance": 6,
-                }
-            )
-            for table in tables:
-                if not table:
-                    continue
-
-                header_idx = None
-                header = None
-                for idx, row in enumerate(table):
-                    header_text = "".join(cell or "" for cell in row)
-                    if "Course" in header_text and "Semester" in header_text:
-                        header_idx = idx
-                        header = row
-                        break
-
-                if header_idx is None or header is None:
-                    continue
-
-                try:
-                    left_positions, right_positions = _parse_header_positions(header)
-                except ValueError:
-                    continue
-                left_bucket: List[Dict[str, str]] = []
-                right_bucket: List[Dict[str, str]] = []
-                for row in table[header_idx + 1 :]:
-                    left_record = _extract_english_record(row, left_positions)
-                    if left_record:
-                        left_bucket.append(left_record)
-                    right_record = _extract_english_record(row, right_positions)
-                    if right_record:
-                        right_bucket.append(right_record)
-                records.extend(left_bucket)
-                records.extend(right_bucket)
+    for tables in _iter_page_grids(pdf_path, backend):
+        for table in tables:
+            if not table:
+                continue
+
+            header_idx = None
+            header = None
+            for idx, row in enumerate(table):
+                if any(cell and "Course" in cell for cell in row) and any(
+                    cell and "Semester" in cell for cell in row
+                ):
+                    header_idx = idx
+                    header = row
+                    break
+
+            if header_idx is None or header is None:
+                continue
+
+            try:
+                left_positions, right_positions = _parse_header_positions(header)
+            except ValueError:
+                continue
+            left_columns = _record_columns(left_positions)
+            right_columns = _record_columns(right_positions)
+            left_bucket: List[Dict[str, str]] = []
+            right_bucket: List[Dict[str, str]] = []
+            for row in table[header_idx + 1 :]:
+                left_record = _extract_english_record(row, left_columns)
+                if left_record:
+                    left_bucket.append(left_record)
+                right_record = _extract_english_record(row, right_columns)
+                if right_record:
+                    right_bucket.append(right_record)
+            records.extend(left_bucket)
+            records.extend(right_bucket)
     return records
 
@@ -0,0 +1,257 @@
+from __future__ import annotations
+
+import re
+import shutil
+from pathlib import Path
+from typing import Dict, List
+from xml.etree import ElementTree as ET
+from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile
+
+import pytest
+
+from nwpu_transcript.excel import load_template, write_to_template
+
+TEMPLATE = Path(__file__).resolve().parents[1] / "课程分学期模版.xlsx"
+SHEET = "xl/worksheets/sheet1.xml"
+SHARED_STRINGS = "xl/sharedStrings.xml"
+GENERATED = (SHEET, SHARED_STRINGS)
+NS = {"main": "http://schemas.openxmlformats.org/spreadsheetml/2006/main"}
+
+RECORDS = [
+    {
+        "课程名": "高等数学",
+        "分数": "95",
+        "学分": "5",
+        "学时": "",
+        "学时单位": "学时",
+        "课程类别": "必修",
+        "学期": "2020-2021-1",
+    },
+    {
+        "课程名": "大学英语",
+        "分数": "88",
+        "学分": "2",
+        "学时": "",
+        "学时单位": "学时",
+        "课程类别": "必修",
+        "学期": "2020-2021-2",
+    },
+]
+
+
+class _Unseekable:
+    """Write-only stream that makes ``ZipFile`` emit data descriptors."""
+
+    def __init__(self, fp) -> None:
+        self._fp = fp
+
+    def write(self, data: bytes) -> int:
+        return self._fp.write(data)
+
+    def flush(self) -> None:
+        self._fp.flush()
+
+
+def _rewrite_template(path: Path, compress_type: int, streamed: bool = False) -> Path:
+    with ZipFile(TEMPLATE) as source, open(path, "wb") as fp:
+        target = _Unseekable(fp) if streamed else fp
+        with ZipFile(target, "w", compression=compress_type) as output:
+            for info in source.infolist():
+                output.writestr(info.filename, source.read(info))
+    return path
+
+
+def _template_with(path: Path, members: Dict[str, bytes]) -> Path:
+    with ZipFile(TEMPLATE) as source, ZipFile(path, "w", ZIP_DEFLATED) as output:
+        for info in source.infolist():
+            output.writestr(info, members.get(info.filename, source.read(info)))
+    return path
+
+
+def _read_member(path: Path, name: str) -> bytes:
+    with ZipFile(path) as z:
+        return z.read(name)
+
+
+def _shared_strings(path: Path) -> List[str]:
+    root = ET.fromstring(_read_member(path, SHARED_STRINGS))
+    return [si.find("main:t", NS).text or "" for si in root.findall("main:si", NS)]
+
+
+def _cell_values(path: Path) -> Dict[str, str]:
+    strings = _shared_strings(path)
+    root = ET.fromstring(_read_member(path, SHEET))
+    return {
+        cell.get("r"): strings[int(cell.find("main:v", NS).text)]
+        for cell in root.iter(f"{{{NS['main']}}}c")
+        if cell.get("t") == "s"
+    }
+
+
+def _assert_copied_members(template: Path, output: Path) -> None:
+    with ZipFile(template) as source, ZipFile(output) as result:
+        assert result.testzip() is None
+        assert result.namelist() == source.namelist()
+        for info in source.infolist():
+            if info.filename in GENERATED:
+                continue
+            copied = result.getinfo(info.filename)
+            assert result.read(copied) == source.read(info)
+            assert (copied.compress_type, copied.CRC, copied.compress_size) == (
+                info.compress_type,
+                info.CRC,
+                info.compress_size,
+            )
+
+
+def test_unchanged_members_are_copied_verbatim(tmp_path: Path) -> None:
+    output = tmp_path / "out.xlsx"
+
+    write_to_template(TEMPLATE, RECORDS, output)
+
+    _assert_copied_members(TEMPLATE, output)
+
+
+@pytest.mark.parametrize("compress_type", [ZIP_DEFLATED, ZIP_STORED])
+def test_template_with_data_descriptors(tmp_path: Path, compress_type: int) -> None:
+    template = _rewrite_template(tmp_path / "template.xlsx", compress_type, streamed=True)
+    with ZipFile(template) as z:
+        assert all(info.flag_bits & 0x08 for info in z.infolist())
+    output = tmp_path / "out.xlsx"
+
+    write_to_template(template, RECORDS, output)
+
+    _assert_copied_members(template, output)
+    with ZipFile(output) as z:
+        assert not any(info.flag_bits & 0x08 for info in z.infolist())
+
+
+def test_stored_template(tmp_path: Path) -> None:
+    template = _rewrite_template(tmp_path / "template.xlsx", ZIP_STORED)
+    output = tmp_path / "out.xlsx"
+
+    write_to_template(template, RECORDS, output)
+
+    _assert_copied_members(template, output)
+
+
+def test_output_may_overwrite_template(tmp_path: Path) -> None:
+    template = tmp_path / "template.xlsx"
+    shutil.copyfile(TEMPLATE, template)
+    state = load_template(template)
+
+    write_to_template(state, RECORDS, template)
+
+    _assert_copied_members(TEMPLATE, template)
+
+
+def test_missing_output_directory_names_output_path(tmp_path: Path) -> None:
+    output = tmp_path / "missing" / "out.xlsx"
+
+    with pytest.raises(FileNotFoundError) as excinfo:
+        write_to_template(TEMPLATE, RECORDS, output)
+
+    assert excinfo.value.filename == str(output)
+    assert not output.parent.exists()
+
+
+def test_sheet_rows_replace_template_rows(tmp_path: Path) -> None:
+    output = tmp_path / "out.xlsx"
+    template_sheet = _read_member(TEMPLATE, SHEET)
+    # The template ships placeholder rows 2 and 3 after the header.
+    assert b'<row r="3"' in template_sheet
+
+    write_to_template(TEMPLATE, RECORDS[:1], output)
+
+    sheet_xml = _read_member(output, SHEET)
+    root = ET.fromstring(sheet_xml)
+    rows = root.findall("main:sheetData/main:row", NS)
+    assert [row.get("r") for row in rows] == ["1", "2"]
+    assert [cell.get("r") for cell in rows[1]] == [f"{col}2" for col in "ABCDEFG"]
+    assert root.find("main:dimension", NS).get("ref") == "A1:G2"
+
+    header_start = template_sheet.index(b'<row r="1"')
+    header = template_sheet[header_start : template_sheet.index(b"</row>", header_start) + 6]
+    assert header in sheet_xml
+    assert sheet_xml.endswith(template_sheet[template_sheet.index(b"</sheetData>") :])
+
+
+def test_empty_records_keep_only_header_row(tmp_path: Path) -> None:
+    output = tmp_path / "out.xlsx"
+
+    write_to_template(TEMPLATE, [], output)
+
+    root = ET.fromstring(_read_member(output, SHEET))
+    assert [row.get("r") for row in root.findall("main:sheetData/main:row", NS)] == ["1"]
+    assert root.find("main:dimension", NS).get("ref") == "A1:G1"
+
+
+def test_shared_strings_reuse_template_entries(tmp_path: Path) -> None:
+    output = tmp_path / "out.xlsx"
+    template_shared = _read_member(TEMPLATE, SHARED_STRINGS)
+
+    write_to_template(TEMPLATE, RECORDS, output)
+
+    shared_xml = _read_member(output, SHARED_STRINGS)
+    root = ET.fromstring(shared_xml)
+    strings = _shared_strings(output)
+    # 7 template entries plus 9 new values; 学时 is already in the template.
+    assert len(strings) == 16
+    assert strings[:7] == ["课程名", "分数", "学分", "学时", "学时单位", "课程类别", "学期"]
+    assert root.get("uniqueCount") == "16"
+    # 7 template references plus 6 non-empty cells per record.
+    assert root.get("count") == "19"
+    # Existing entries are carried over verbatim.
+    body_start = template_shared.index(b"<si>")
+    assert template_shared[body_start : template_shared.rindex(b"</sst>")] in shared_xml
+
+    assert b'<c r="E2" s="6" t="s"><v>3</v></c>' in _read_member(output, SHEET)
+    values = _cell_values(output)
+    for row, record in enumerate(RECORDS, start=2):
+        for col, key in zip("ABCDEFG", record):
+            if record[key]:
+                assert values[f"{col}{row}"] == record[key]
+
+
+def test_shared_strings_escape_appended_values(tmp_path: Path) -> None:
+    output = tmp_path / "out.xlsx"
+    record = dict(RECORDS[0], 课程名='R&D <Lab> "A"')
+
+    write_to_template(TEMPLATE, [record], output)
+
+    assert b"<si><t>R&amp;D &lt;Lab&gt; \"A\"</t></si>" in _read_member(output, SHARED_STRINGS)
+    assert _cell_values(output)["A2"] == 'R&D <Lab> "A"'
+
+
+def test_self_closing_sst_in_template(tmp_path: Path) -> None:
+    template = _template_with(
+        tmp_path / "template.xlsx",
+        {
+            SHARED_STRINGS: b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\r\n'
+            b'<sst xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"'
+            b' count="0" uniqueCount="0"/>'
+        },
+    )
+    output = tmp_path / "out.xlsx"
+
+    write_to_template(template, RECORDS[:1], output)
+
+    root = ET.fromstring(_read_member(output, SHARED_STRINGS))
+    assert _shared_strings(output) == ["高等数学", "95", "5", "学时", "必修", "2020-2021-1"]
+    assert (root.get("count"), root.get("uniqueCount")) == ("6", "6")
+
+
+def test_single_quoted_sst_attributes(tmp_path: Path) -> None:
+    shared = _read_member(TEMPLATE, SHARED_STRINGS)
+    shared = shared.replace(b'count="7" uniqueCount="7"', b"count='7' uniqueCount = '7'")
+    template = _template_with(tmp_path / "template.xlsx", {SHARED_STRINGS: shared})
+    output = tmp_path / "out.xlsx"
+
+    write_to_template(template, RECORDS, output)
+
+    shared_xml = _read_member(output, SHARED_STRINGS)
+    open_tag = re.search(rb"<sst\b[^>]*>", shared_xml).group(0)
+    assert len(re.findall(rb"\scount\s*=", open_tag)) == 1
+    assert len(re.findall(rb"\suniqueCount\s*=", open_tag)) == 1
+    root = ET.fromstring(shared_xml)
+    assert (root.get("count"), root.get("uniqueCount")) == ("19", "16")
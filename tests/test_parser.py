@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pdfplumber
+import pytest
+
+from nwpu_transcript.parser import _TABLE_SETTINGS, _iter_page_grids, parse_english
+
+def _write_ruled_pdf(path: Path, xs, ys, texts) -> None:
+    """Write a one-page PDF with a ruled grid and Helvetica text.
+
+    ``xs`` and ``ys`` are the grid lines and ``texts`` holds
+    ``(x, baseline, font_size, text)``, all in top-left coordinates.
+    """
+    width, height = xs[-1] + 10, ys[-1] + 10
+    ops = []
+    for x in xs:
+        ops.append(f"{x} {height - ys[0]} m {x} {height - ys[-1]} l S")
+    for y in ys:
+        ops.append(f"{xs[0]} {height - y} m {xs[-1]} {height - y} l S")
+    for x, baseline, size, text in texts:
+        ops.append(f"BT /F1 {size} Tf {x} {height - baseline} Td ({text}) Tj ET")
+    content = "\n".join(ops).encode("ascii")
+
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] /Contents 4 0 R"
+        b" /Resources << /Font << /F1 5 0 R >> >> >>" % (width, height),
+        b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        xref,
+    )
+    path.write_bytes(out)
+
+
+@pytest.fixture
+def ruled_pdf(tmp_path: Path) -> Path:
+    path = tmp_path / "ruled.pdf"
+    _write_ruled_pdf(
+        path,
+        (10, 40, 70, 100),
+        (10, 25, 40),
+        [
+            (12, 21, 7, "95"),
+            # "Req" ends less than a word gap before "3", whose midpoint is in
+            # the next cell, so a word-level binning would merge them.
+            (58, 21, 7, "Req"),
+            (69.5, 21, 7, "3"),
+            # Overflows the first cell of the second row into the second.
+            (12, 36, 7, "Linear Algebra"),
+            (72, 36, 7, "1st"),
+        ],
+    )
+    return path
+
+
+def _extract_table(pdf_path: Path):
+    with pdfplumber.open(pdf_path) as pdf:
+        return pdf.pages[0].extract_table(table_settings=_TABLE_SETTINGS)
+
+
+def test_pdfplumber_grid_matches_extract_table(ruled_pdf: Path) -> None:
+    expected = _extract_table(ruled_pdf)
+    assert expected[0] == ["95", "Req", "3"]
+
+    grids = list(_iter_page_grids(ruled_pdf, "pdfplumber", largest_only=True))
+
+    assert grids == [[expected]]
+
+
+def test_pymupdf_grid_matches_extract_table(ruled_pdf: Path) -> None:
+    pytest.importorskip("pymupdf")
+    expected = _extract_table(ruled_pdf)
+
+    grids = list(_iter_page_grids(ruled_pdf, "pymupdf", largest_only=True))
+
+    assert grids == [[expected]]
+
+
+_EN_LABELS = ("Course", "Credit", "Score", "Type", "Semester")
+_EN_WIDTHS = (90, 30, 30, 40, 60)
+
+
+@pytest.fixture
+def english_pdf(tmp_path: Path) -> Path:
+    """An English transcript table with 30 rows of two courses each.
+
+    Every third row has its text riding on the row's top rule, so only
+    glyph boxes of pdfminer's height keep it in its own row.
+    """
+    xs = [10]
+    for width in _EN_WIDTHS * 2:
+        xs.append(xs[-1] + width)
+    row_height = 12
+    ys = [10 + row * row_height for row in range(32)]
+    texts = []
+    for col, label in enumerate(_EN_LABELS * 2):
+        texts.append((xs[col] + 2, ys[0] + 9, 7, label))
+    for row in range(1, 31):
+        baseline = ys[row] + (2.4 if row % 3 == 0 else 9)
+        for side in (0, 5):
+            number = row * 2 + side // 5
+            values = (
+                f"Course {number}",
+                str(1 + number % 4),
+                str(60 + number % 40),
+                "Required",
+                "1st 2020-2021",
+            )
+            for col, value in enumerate(values):
+                texts.append((xs[side + col] + 2, baseline, 7, value))
+    path = tmp_path / "english.pdf"
+    _write_ruled_pdf(path, xs, ys, texts)
+    return path
+
+
+def _english_records(side: int):
+    records = []
+    for row in range(1, 31):
+        number = row * 2 + side
+        records.append(
+            {
+                "课程名": f"Course {number}",
+                "分数": str(60 + number % 40),
+                "学分": str(1 + number % 4),
+                "学时": "",
+                "学时单位": "",
+                "课程类别": "Required",
+                "学期": "2020-2021-1",
+            }
+        )
+    return records
+
+
+@pytest.mark.parametrize("backend", ["pdfplumber", "pymupdf"])
+def test_parse_english_multi_row(english_pdf: Path, backend: str, capsys) -> None:
+    if backend == "pymupdf":
+        pytest.importorskip("pymupdf")
+
+    records = parse_english(english_pdf, backend)
+
+    assert records == _english_records(0) + _english_records(1)
+    assert capsys.readouterr().out == ""